@@ -3,10 +3,17 @@ Configuration management using environment variables
 """
 
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
+@lru_cache(maxsize=1)
+def _load_env():
+    """Load the .env file once per process"""
+    load_dotenv()
+    return True
+
 # Load .env file
-load_dotenv()
+_load_env()
 
 class Config:
     # Database
@@ -15,17 +22,29 @@ class Config:
     DB_NAME = os.getenv("DB_NAME", "customer_analytics")
     DB_USER = os.getenv("DB_USER", "postgres")
     DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    
+    # Connection pool - every uvicorn worker has its own pool, so the
+    # connection budget is split across WEB_CONCURRENCY workers
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "2"))
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+    _WORKER_CONNECTIONS = max(2, DB_MAX_CONNECTIONS // WEB_CONCURRENCY)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(_WORKER_CONNECTIONS // 2)))
+    DB_POOL_OVERFLOW = int(os.getenv("DB_POOL_OVERFLOW", str(max(0, _WORKER_CONNECTIONS - DB_POOL_SIZE))))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", str(min(5, DB_POOL_SIZE))))
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "1024"))
     
     # API
     API_PORT = int(os.getenv("API_PORT", "8000"))
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     SECRET_KEY = os.getenv("SECRET_KEY", "default-secret-key-change-this")
+    CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
     
     # Dashboard
     DASHBOARD_PORT = int(os.getenv("DASHBOARD_PORT", "3000"))
-    
-    @property
-    def DATABASE_URL(self):
-        return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
 config = Config()
\ No newline at end of file
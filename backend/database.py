@@ -2,36 +2,47 @@
 Database connection configuration
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
+from backend.config import config
 
-# Database configuration - UPDATED WITH YOUR PASSWORD
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 5432,
-    'database': 'customer_analytics',
-    'user': 'postgres',
-    'password': 'YourNewPassword123'  # Your updated password
-}
+# Create async engine - LIFO keeps recently used connections warm, pre-ping drops dead ones
+engine = create_async_engine(
+    config.ASYNC_DATABASE_URL,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_POOL_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    # Keep prepared statements per connection so hot queries skip re-parsing and planning
+    connect_args={
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        # Queries are short lookups where JIT compilation costs more than it saves
+        "server_settings": {"jit": "off"},
+        # Fail fast on an unreachable host instead of asyncpg's 60 s default, so startup is not held up
+        "timeout": config.DB_CONNECT_TIMEOUT
+    }
+)
 
-# Create database URL
-DATABASE_URL = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-
-# Create engine
-engine = create_engine(DATABASE_URL)
+@event.listens_for(engine.sync_engine, "connect")
+def _register_numeric_codec(dbapi_connection, connection_record):
+    """Decode NUMERIC values to float on the driver instead of Decimal"""
+    dbapi_connection.run_async(
+        lambda conn: conn.set_type_codec(
+            "numeric", encoder=str, decoder=float, schema="pg_catalog", format="text"
+        )
+    )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Create base class for models
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
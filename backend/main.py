@@ -1,11 +1,57 @@
 """
-Super Simple FastAPI App
+Customer Analytics FastAPI App
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 from datetime import datetime
+from backend.config import config
+from backend.database import engine
+from backend.routers import sales, customers, forecast, auth
 
-app = FastAPI()
+# Routers mounted on the app - register new routers here
+ROUTERS = [
+    (sales.router, "/api/sales", ["Sales"]),
+    (customers.router, "/api/customers", ["Customers"]),
+    (forecast.router, "/api/forecast", ["Forecast"]),
+    (auth.router, "/api/auth", ["Auth"]),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the connection pool and table metadata before the first request"""
+    conns = []
+    reachable = False
+    try:
+        for _ in range(config.DB_POOL_WARM):
+            conn = await engine.connect()
+            conns.append(conn)
+            await conn.execute(text("SELECT 1"))
+        reachable = True
+        print(f"Database pool warmed with {len(conns)} connections")
+    except Exception as e:
+        print(f"Could not warm database pool: {str(e) or type(e).__name__}")
+    finally:
+        for conn in conns:
+            await conn.close()
+    
+    # Reflect table metadata once instead of querying the catalog per request.
+    # Skipped when the database is unreachable - requests then probe tables on demand.
+    if reachable:
+        try:
+            async with engine.connect() as conn:
+                await sales.reflect_tables(conn)
+        except Exception as e:
+            print(f"Could not reflect sales tables: {str(e) or type(e).__name__}")
+    
+    yield
+    
+    await engine.dispose()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,6 +60,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads (daily forecast, top customers lists)
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
+for router, prefix, tags in ROUTERS:
+    app.include_router(router, prefix=prefix, tags=tags)
+
 @app.get("/")
 async def root():
     return {
@@ -28,14 +80,4 @@ async def health():
 
 @app.get("/api/test")
 async def test():
-    return {"test": "successful"}
-
-@app.get("/api/sales/summary")
-async def sales_summary():
-    return {
-        "total_revenue": 1250000,
-        "total_orders": 15000,
-        "unique_customers": 5000,
-        "avg_order_value": 83.33,
-        "message": "Sample data - Database connection not required"
-    }
\ No newline at end of file
+    return {"test": "successful"}
\ No newline at end of file
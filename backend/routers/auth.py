@@ -5,11 +5,15 @@ Authentication endpoints - Simplified version
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import Optional
-from datetime import datetime, timedelta
 from pydantic import BaseModel
+from functools import lru_cache
+import hmac
+import secrets
 
 router = APIRouter()
 
+_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+
 # Simple token model
 class Token(BaseModel):
     access_token: str
@@ -39,13 +43,21 @@ fake_users_db = {
     }
 }
 
+# Password bytes precomputed once for constant-time comparison
+_USERS = {u: (d["password"].encode(), d) for u, d in fake_users_db.items()}
+
+@lru_cache(maxsize=128)
+def _issue_token(username: str) -> str:
+    """Issue one opaque token per user for the lifetime of the process"""
+    return secrets.token_urlsafe(16)
+
 @router.post("/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Simple login endpoint"""
     
     # Check if user exists
-    user = fake_users_db.get(form_data.username)
-    if not user or user["password"] != form_data.password:
+    user = _USERS.get(form_data.username)
+    if not user or not hmac.compare_digest(user[0], form_data.password.encode()):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -54,12 +66,12 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     
     # Return token (simplified)
     return {
-        "access_token": f"token-{form_data.username}-{datetime.now().timestamp()}",
+        "access_token": _issue_token(form_data.username),
         "token_type": "bearer"
     }
 
 @router.get("/me", response_model=User)
-async def get_current_user(token: str = Depends(OAuth2PasswordBearer(tokenUrl="token", auto_error=False))):
+async def get_current_user(token: str = Depends(_oauth2_scheme)):
     """Get current user info"""
     
     # Simplified - return a default user
@@ -71,6 +83,6 @@ async def get_current_user(token: str = Depends(OAuth2PasswordBearer(tokenUrl="t
     )
 
 @router.get("/verify")
-async def verify_token():
+async def verify_token(token: str = Depends(_oauth2_scheme)):
     """Verify if token is valid"""
     return {"valid": True, "user": "demo_user"}
\ No newline at end of file
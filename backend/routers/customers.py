@@ -2,17 +2,24 @@
 Customer segmentation and RFM endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, TextClause
 from typing import Optional, List
-from pydantic import BaseModel
-from backend.database import get_db
+from pydantic import BaseModel, ConfigDict
+from async_lru import alru_cache
+import orjson
+from backend.config import config
+from backend.database import get_db, AsyncSessionLocal
+from backend.segments import SEGMENT_CHAMPION, SEGMENT_AT_RISK, SEGMENT_LOST
+from backend.utils.helpers import encode_with_etag, etag_response
 
 router = APIRouter()
 
 # Pydantic models
 class RFMCustomer(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     customerid: str
     recency: int
     frequency: int
@@ -24,6 +31,8 @@ class RFMCustomer(BaseModel):
     segment: str
 
 class SegmentSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     segment: str
     customer_count: int
     total_revenue: float
@@ -32,6 +41,8 @@ class SegmentSummary(BaseModel):
     revenue_percentage: float
 
 class CustomerValue(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     customerid: str
     total_spent: float
     total_orders: int
@@ -39,219 +50,168 @@ class CustomerValue(BaseModel):
     days_since_last_order: int
     segment: str
 
-@router.get("/segments", response_model=List[SegmentSummary])
-async def get_segment_summary(
-    db: Session = Depends(get_db)
-):
-    """Get summary of all customer segments"""
-    
-    query = text("""
-        SELECT 
-            segment,
-            customer_count,
-            total_revenue,
-            avg_monetary,
-            customer_percentage,
-            revenue_percentage
-        FROM segment_summary
-        ORDER BY total_revenue DESC
+# SQL queries - compiled once at import
+_Q_SEGMENTS = text("""
+    SELECT 
+        segment,
+        customer_count,
+        total_revenue,
+        avg_monetary,
+        customer_percentage,
+        revenue_percentage
+    FROM segment_summary
+    ORDER BY total_revenue DESC
+""")
+
+_RFM_COLUMNS = "customerid, recency, frequency, monetary, r_score, f_score, m_score, rfm_score, segment"
+
+def _rfm_query(where: Optional[str], order: str) -> TextClause:
+    """Build one RFM listing query from the shared column list"""
+    where_clause = f"WHERE {where}" if where else ""
+    return text(f"""
+        SELECT {_RFM_COLUMNS}
+        FROM rfm_segments
+        {where_clause}
+        ORDER BY {order}
+        LIMIT :limit
     """)
+
+_Q_RFM_TOP = _rfm_query(None, "rfm_score DESC, monetary DESC")
+
+_Q_RFM_AT_RISK = _rfm_query(
+    "segment_code IN (:at_risk, :lost)", "monetary DESC"
+).bindparams(at_risk=SEGMENT_AT_RISK, lost=SEGMENT_LOST)
+
+_Q_RFM_CHAMPIONS = _rfm_query(
+    "segment_code = :champion", "monetary DESC"
+).bindparams(champion=SEGMENT_CHAMPION)
+
+_Q_CUSTOMER_DETAILS = text("""
+    SELECT 
+        r.customerid,
+        r.monetary as total_spent,
+        r.frequency as total_orders,
+        COALESCE(r.monetary / NULLIF(r.frequency, 0), 0) as avg_order_value,
+        r.recency as days_since_last_order,
+        r.segment
+    FROM rfm_segments r
+    WHERE r.customerid = :customer_id
+""")
+
+_Q_CUSTOMER_DETAILS_BATCH = text("""
+    SELECT 
+        r.customerid,
+        r.monetary as total_spent,
+        r.frequency as total_orders,
+        COALESCE(r.monetary / NULLIF(r.frequency, 0), 0) as avg_order_value,
+        r.recency as days_since_last_order,
+        r.segment
+    FROM rfm_segments r
+    WHERE r.customerid = ANY(:ids)
+""")
+
+_Q_RFM_STATS = text("""
+    SELECT 
+        COUNT(*) as total_customers,
+        AVG(recency) as avg_recency,
+        AVG(frequency) as avg_frequency,
+        AVG(monetary) as avg_monetary,
+        SUM(monetary) as total_customer_value,
+        MIN(recency) as best_recency,
+        MAX(recency) as worst_recency,
+        MAX(frequency) as max_frequency,
+        MAX(monetary) as max_monetary
+    FROM rfm_segments
+""")
+
+async def _fetch_rfm(db: AsyncSession, query: TextClause, limit: int) -> List[RFMCustomer]:
+    results = (await db.execute(query, {"limit": limit})).mappings()
+    return [RFMCustomer.model_validate(row) for row in results]
+
+# Cached aggregates - only change when the data is reloaded
+@alru_cache(maxsize=32, ttl=config.CACHE_TTL)
+async def _cached_segment_summary():
+    async with AsyncSessionLocal() as db:
+        results = (await db.execute(_Q_SEGMENTS)).mappings()
+        return encode_with_etag([SegmentSummary.model_validate(row).model_dump() for row in results])
+
+@alru_cache(maxsize=32, ttl=config.CACHE_TTL)
+async def _cached_rfm_statistics():
+    async with AsyncSessionLocal() as db:
+        result = (await db.execute(_Q_RFM_STATS)).first()
     
-    results = db.execute(query).fetchall()
+    return orjson.dumps({
+        "total_customers": result[0],
+        "average_recency_days": round(result[1], 1),
+        "average_frequency": round(result[2], 2),
+        "average_customer_value": round(result[3], 2),
+        "total_customer_value": round(result[4], 2),
+        "best_recency_days": result[5],
+        "worst_recency_days": result[6],
+        "max_frequency": result[7],
+        "max_customer_value": round(result[8], 2)
+    })
+
+@router.get("/segments", response_model=List[SegmentSummary])
+async def get_segment_summary(request: Request):
+    """Get summary of all customer segments"""
     
-    return [
-        SegmentSummary(
-            segment=row[0],
-            customer_count=row[1],
-            total_revenue=float(row[2]),
-            avg_monetary=float(row[3]),
-            customer_percentage=float(row[4]),
-            revenue_percentage=float(row[5])
-        ) for row in results
-    ]
+    return etag_response(request, await _cached_segment_summary())
 
 @router.get("/rfm/top", response_model=List[RFMCustomer])
 async def get_top_customers(
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get top customers by RFM score"""
     
-    query = text("""
-        SELECT 
-            customerid,
-            recency,
-            frequency,
-            monetary,
-            r_score,
-            f_score,
-            m_score,
-            rfm_score,
-            segment
-        FROM rfm_segments
-        ORDER BY rfm_score DESC, monetary DESC
-        LIMIT :limit
-    """)
-    
-    results = db.execute(query, {"limit": limit}).fetchall()
-    
-    return [
-        RFMCustomer(
-            customerid=row[0],
-            recency=row[1],
-            frequency=row[2],
-            monetary=float(row[3]),
-            r_score=row[4],
-            f_score=row[5],
-            m_score=row[6],
-            rfm_score=row[7],
-            segment=row[8]
-        ) for row in results
-    ]
+    return await _fetch_rfm(db, _Q_RFM_TOP, limit)
 
 @router.get("/rfm/at-risk", response_model=List[RFMCustomer])
 async def get_at_risk_customers(
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get at-risk customers (need attention)"""
     
-    query = text("""
-        SELECT 
-            customerid,
-            recency,
-            frequency,
-            monetary,
-            r_score,
-            f_score,
-            m_score,
-            rfm_score,
-            segment
-        FROM rfm_segments
-        WHERE segment LIKE '%At Risk%' OR segment LIKE '%Lost%'
-        ORDER BY monetary DESC
-        LIMIT :limit
-    """)
-    
-    results = db.execute(query, {"limit": limit}).fetchall()
-    
-    return [
-        RFMCustomer(
-            customerid=row[0],
-            recency=row[1],
-            frequency=row[2],
-            monetary=float(row[3]),
-            r_score=row[4],
-            f_score=row[5],
-            m_score=row[6],
-            rfm_score=row[7],
-            segment=row[8]
-        ) for row in results
-    ]
+    return await _fetch_rfm(db, _Q_RFM_AT_RISK, limit)
 
 @router.get("/rfm/champions", response_model=List[RFMCustomer])
 async def get_champion_customers(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get champion customers (best customers)"""
     
-    query = text("""
-        SELECT 
-            customerid,
-            recency,
-            frequency,
-            monetary,
-            r_score,
-            f_score,
-            m_score,
-            rfm_score,
-            segment
-        FROM rfm_segments
-        WHERE segment LIKE '%Champion%'
-        ORDER BY monetary DESC
-        LIMIT :limit
-    """)
+    return await _fetch_rfm(db, _Q_RFM_CHAMPIONS, limit)
+
+@router.post("/rfm/batch", response_model=List[CustomerValue])
+async def get_customer_details_batch(
+    ids: List[str] = Body(..., min_length=1, max_length=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get details for several customers in one request (unknown IDs are skipped)"""
     
-    results = db.execute(query, {"limit": limit}).fetchall()
+    results = (await db.execute(_Q_CUSTOMER_DETAILS_BATCH, {"ids": ids})).mappings()
     
-    return [
-        RFMCustomer(
-            customerid=row[0],
-            recency=row[1],
-            frequency=row[2],
-            monetary=float(row[3]),
-            r_score=row[4],
-            f_score=row[5],
-            m_score=row[6],
-            rfm_score=row[7],
-            segment=row[8]
-        ) for row in results
-    ]
+    return [CustomerValue.model_validate(row) for row in results]
 
 @router.get("/rfm/{customer_id}", response_model=CustomerValue)
 async def get_customer_details(
     customer_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get detailed information about a specific customer"""
     
-    query = text("""
-        SELECT 
-            r.customerid,
-            r.monetary as total_spent,
-            r.frequency as total_orders,
-            r.monetary / NULLIF(r.frequency, 0) as avg_order_value,
-            r.recency as days_since_last_order,
-            r.segment
-        FROM rfm_segments r
-        WHERE r.customerid = :customer_id
-    """)
-    
-    result = db.execute(query, {"customer_id": customer_id}).first()
+    result = (await db.execute(_Q_CUSTOMER_DETAILS, {"customer_id": customer_id})).mappings().first()
     
     if not result:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    return CustomerValue(
-        customerid=result[0],
-        total_spent=float(result[1]),
-        total_orders=result[2],
-        avg_order_value=float(result[3]) if result[3] else 0,
-        days_since_last_order=result[4],
-        segment=result[5]
-    )
+    return CustomerValue.model_validate(result)
 
 @router.get("/rfm/stats/overview")
-async def get_rfm_statistics(
-    db: Session = Depends(get_db)
-):
+async def get_rfm_statistics():
     """Get overall RFM statistics"""
     
-    query = text("""
-        SELECT 
-            COUNT(*) as total_customers,
-            AVG(recency) as avg_recency,
-            AVG(frequency) as avg_frequency,
-            AVG(monetary) as avg_monetary,
-            SUM(monetary) as total_customer_value,
-            MIN(recency) as best_recency,
-            MAX(recency) as worst_recency,
-            MAX(frequency) as max_frequency,
-            MAX(monetary) as max_monetary
-        FROM rfm_segments
-    """)
-    
-    result = db.execute(query).first()
-    
-    return {
-        "total_customers": result[0],
-        "average_recency_days": round(float(result[1]), 1),
-        "average_frequency": round(float(result[2]), 2),
-        "average_customer_value": round(float(result[3]), 2),
-        "total_customer_value": round(float(result[4]), 2),
-        "best_recency_days": result[5],
-        "worst_recency_days": result[6],
-        "max_frequency": result[7],
-        "max_customer_value": round(float(result[8]), 2)
-    }
\ No newline at end of file
+    return Response(content=await _cached_rfm_statistics(), media_type="application/json")
\ No newline at end of file
@@ -2,18 +2,23 @@
 Sales forecast endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import Optional, List
 from datetime import datetime, timedelta
-from pydantic import BaseModel
-from backend.database import get_db
+from pydantic import BaseModel, ConfigDict
+from async_lru import alru_cache
+from backend.config import config
+from backend.database import get_db, AsyncSessionLocal
+from backend.utils.helpers import encode_with_etag, etag_response
 
 router = APIRouter()
 
 # Pydantic models
 class ForecastDay(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     date: str
     predicted_revenue: float
     confidence_lower: float
@@ -21,10 +26,14 @@ class ForecastDay(BaseModel):
     month: str
 
 class MonthlyForecast(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     month: str
     predicted_revenue: float
 
 class ForecastSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     total_forecast: float
     avg_daily: float
     peak_day: str
@@ -33,135 +42,99 @@ class ForecastSummary(BaseModel):
     low_value: float
     days_forecasted: int
 
-@router.get("/daily", response_model=List[ForecastDay])
-async def get_daily_forecast(
-    days: int = Query(30, ge=1, le=90),
-    db: Session = Depends(get_db)
-):
-    """Get daily sales forecast"""
-    
-    query = text("""
-        SELECT 
-            TO_CHAR(forecast_date, 'YYYY-MM-DD') as date,
-            predicted_revenue,
-            confidence_lower,
-            confidence_upper,
-            month
-        FROM sales_forecast
-        ORDER BY forecast_date
-        LIMIT :days
-    """)
-    
-    results = db.execute(query, {"days": days}).fetchall()
-    
-    return [
-        ForecastDay(
-            date=row[0],
-            predicted_revenue=float(row[1]),
-            confidence_lower=float(row[2]),
-            confidence_upper=float(row[3]),
-            month=row[4]
-        ) for row in results
-    ]
+# SQL queries - compiled once at import
+_Q_DAILY = text("""
+    SELECT 
+        TO_CHAR(forecast_date, 'YYYY-MM-DD') as date,
+        predicted_revenue,
+        confidence_lower,
+        confidence_upper,
+        month
+    FROM sales_forecast
+    ORDER BY forecast_date
+    LIMIT :days
+""")
 
-@router.get("/monthly", response_model=List[MonthlyForecast])
-async def get_monthly_forecast(
-    db: Session = Depends(get_db)
-):
-    """Get monthly sales forecast"""
-    
-    query = text("""
-        SELECT 
-            forecast_month,
-            predicted_revenue
-        FROM monthly_forecast
-        ORDER BY forecast_month
-    """)
-    
-    results = db.execute(query).fetchall()
-    
-    return [
-        MonthlyForecast(
-            month=row[0],
-            predicted_revenue=float(row[1])
-        ) for row in results
-    ]
+_Q_MONTHLY = text("""
+    SELECT 
+        forecast_month as month,
+        predicted_revenue
+    FROM monthly_forecast
+    ORDER BY forecast_month
+""")
 
-@router.get("/summary", response_model=ForecastSummary)
-async def get_forecast_summary(
-    db: Session = Depends(get_db)
-):
-    """Get summary of sales forecast"""
-    
-    query = text("""
-        SELECT 
-            SUM(predicted_revenue) as total,
-            AVG(predicted_revenue) as avg_daily,
-            MAX(predicted_revenue) as peak,
-            MIN(predicted_revenue) as low,
-            COUNT(*) as days
-        FROM sales_forecast
-    """)
-    
-    result = db.execute(query).first()
-    
-    # Get peak and low dates
-    peak_query = text("""
-        SELECT 
-            TO_CHAR(forecast_date, 'YYYY-MM-DD')
-        FROM sales_forecast
-        WHERE predicted_revenue = (SELECT MAX(predicted_revenue) FROM sales_forecast)
-        LIMIT 1
-    """)
-    
-    low_query = text("""
-        SELECT 
-            TO_CHAR(forecast_date, 'YYYY-MM-DD')
-        FROM sales_forecast
-        WHERE predicted_revenue = (SELECT MIN(predicted_revenue) FROM sales_forecast)
-        LIMIT 1
-    """)
-    
-    peak_date = db.execute(peak_query).scalar()
-    low_date = db.execute(low_query).scalar()
-    
-    return ForecastSummary(
-        total_forecast=float(result[0]),
-        avg_daily=float(result[1]),
-        peak_day=peak_date,
-        peak_value=float(result[2]),
-        low_day=low_date,
-        low_value=float(result[3]),
-        days_forecasted=result[4]
-    )
+_Q_SUMMARY = text("""
+    SELECT 
+        SUM(predicted_revenue) as total_forecast,
+        AVG(predicted_revenue) as avg_daily,
+        MAX(predicted_revenue) as peak_value,
+        MIN(predicted_revenue) as low_value,
+        COUNT(*) as days_forecasted,
+        (SELECT TO_CHAR(forecast_date, 'YYYY-MM-DD')
+         FROM sales_forecast
+         WHERE predicted_revenue IS NOT NULL
+         ORDER BY predicted_revenue DESC
+         LIMIT 1) as peak_day,
+        (SELECT TO_CHAR(forecast_date, 'YYYY-MM-DD')
+         FROM sales_forecast
+         WHERE predicted_revenue IS NOT NULL
+         ORDER BY predicted_revenue ASC
+         LIMIT 1) as low_day
+    FROM sales_forecast
+""")
 
-@router.get("/insights")
-async def get_forecast_insights(
-    db: Session = Depends(get_db)
-):
-    """Get business insights from forecast"""
-    
-    # Get forecast data
-    forecast_query = text("""
+_Q_INSIGHTS = text("""
+    SELECT 
+        f.total_90day,
+        f.avg_daily_forecast,
+        h.avg_daily_historical,
+        m.forecast_month as peak_month,
+        m.predicted_revenue as peak_month_revenue
+    FROM (
         SELECT 
             SUM(predicted_revenue) as total_90day,
             AVG(predicted_revenue) as avg_daily_forecast
         FROM sales_forecast
-    """)
-    
-    # Get historical data for comparison
-    historical_query = text("""
+    ) f
+    CROSS JOIN (
         SELECT 
             AVG(daily_revenue) as avg_daily_historical
         FROM daily_sales
         WHERE sale_date >= CURRENT_DATE - INTERVAL '90 days'
-    """)
+    ) h
+    LEFT JOIN (
+        SELECT 
+            forecast_month,
+            predicted_revenue
+        FROM monthly_forecast
+        ORDER BY predicted_revenue DESC
+        LIMIT 1
+    ) m ON TRUE
+""")
+
+# Cached aggregates - only change when the forecast is reloaded
+@alru_cache(maxsize=32, ttl=config.CACHE_TTL)
+async def _cached_monthly_forecast():
+    async with AsyncSessionLocal() as db:
+        results = (await db.execute(_Q_MONTHLY)).mappings()
+        return encode_with_etag([MonthlyForecast.model_validate(row).model_dump() for row in results])
+
+@alru_cache(maxsize=32, ttl=config.CACHE_TTL)
+async def _cached_forecast_summary():
+    # Totals plus peak and low dates in a single round trip
+    async with AsyncSessionLocal() as db:
+        result = (await db.execute(_Q_SUMMARY)).mappings().first()
     
-    forecast_result = db.execute(forecast_query).first()
-    historical_result = db.execute(historical_query).first()
+    return ForecastSummary.model_validate(result)
+
+@alru_cache(maxsize=32, ttl=config.CACHE_TTL)
+async def _cached_forecast_insights():
+    # Get forecast data, historical data for comparison and peak month together
+    async with AsyncSessionLocal() as db:
+        result = (await db.execute(_Q_INSIGHTS)).first()
     
-    forecast_avg = float(forecast_result[1])
-    historical_avg = float(historical_result[0]) if historical_result[0] else 0
+    forecast_avg = result[1]
+    historical_avg = result[2] or 0
     
     # Calculate growth
     if historical_avg > 0:
@@ -169,29 +142,48 @@ async def get_forecast_insights(
     else:
         growth = 0
     
-    # Get peak month
-    month_query = text("""
-        SELECT 
-            forecast_month,
-            predicted_revenue
-        FROM monthly_forecast
-        ORDER BY predicted_revenue DESC
-        LIMIT 1
-    """)
-    
-    peak_month = db.execute(month_query).first()
+    peak_month = result[3]
     
-    return {
-        "total_forecast_next_90days": round(float(forecast_result[0]), 2),
+    return encode_with_etag({
+        "total_forecast_next_90days": round(result[0], 2),
         "average_daily_forecast": round(forecast_avg, 2),
         "average_daily_historical": round(historical_avg, 2),
         "expected_growth_percentage": round(growth, 1),
-        "peak_month": peak_month[0] if peak_month else None,
-        "peak_month_revenue": round(float(peak_month[1]), 2) if peak_month else None,
+        "peak_month": peak_month,
+        "peak_month_revenue": round(result[4], 2) if peak_month else None,
         "recommendations": [
             f"Increase inventory by {max(0, round(growth))}% to meet expected demand",
-            f"Prepare for peak season in {peak_month[0] if peak_month else 'upcoming months'}",
+            f"Prepare for peak season in {peak_month if peak_month else 'upcoming months'}",
             "Plan promotions during low periods to boost sales",
             "Ensure adequate staffing for predicted busy periods"
         ]
-    }
\ No newline at end of file
+    })
+
+@router.get("/daily", response_model=List[ForecastDay])
+async def get_daily_forecast(
+    days: int = Query(30, ge=1, le=90),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get daily sales forecast"""
+    
+    results = (await db.execute(_Q_DAILY, {"days": days})).mappings()
+    
+    return [ForecastDay.model_validate(row) for row in results]
+
+@router.get("/monthly", response_model=List[MonthlyForecast])
+async def get_monthly_forecast(request: Request):
+    """Get monthly sales forecast"""
+    
+    return etag_response(request, await _cached_monthly_forecast())
+
+@router.get("/summary", response_model=ForecastSummary)
+async def get_forecast_summary():
+    """Get summary of sales forecast"""
+    
+    return await _cached_forecast_summary()
+
+@router.get("/insights")
+async def get_forecast_insights(request: Request):
+    """Get business insights from forecast"""
+    
+    return etag_response(request, await _cached_forecast_insights())
\ No newline at end of file
@@ -0,0 +1,16 @@
+"""
+RFM segment codes shared by the API and the data loaders
+"""
+
+# Codes stored in rfm_segments.segment_code
+SEGMENT_OTHER = 0
+SEGMENT_CHAMPION = 1
+SEGMENT_AT_RISK = 2
+SEGMENT_LOST = 3
+
+# Segment name patterns, checked in order - the first match sets the code
+SEGMENT_PATTERNS = [
+    (SEGMENT_CHAMPION, '%Champion%'),
+    (SEGMENT_AT_RISK, '%At Risk%'),
+    (SEGMENT_LOST, '%Lost%'),
+]
@@ -0,0 +1,23 @@
+"""
+Shared helpers for API routers
+"""
+
+import hashlib
+import orjson
+from fastapi import Request, Response
+
+def encode_with_etag(content):
+    """Serialize content once and derive a weak ETag from the bytes"""
+    body = orjson.dumps(content)
+    return body, f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+def etag_response(request: Request, cached, max_age: int = 60):
+    """Return 304 when the client already holds this version of the body"""
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": f"max-age={max_age}"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -2,7 +2,8 @@
 Simple monitoring script
 """
 
-import requests
+import aiohttp
+import asyncio
 import time
 from datetime import datetime
 
@@ -13,16 +14,18 @@ ENDPOINTS = [
     "/api/customers/rfm/stats/overview",
     "/api/forecast/summary"
 ]
+TIMEOUT = aiohttp.ClientTimeout(total=5)
 
-def check_endpoint(url):
+async def check_endpoint(session, url):
     try:
-        start = time.time()
-        response = requests.get(url)
-        duration = time.time() - start
+        start = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        duration = time.perf_counter() - start
         
         return {
             "url": url,
-            "status": response.status_code,
+            "status": response.status,
             "duration": round(duration * 1000, 2),
             "timestamp": datetime.now().isoformat()
         }
@@ -30,22 +33,29 @@ def check_endpoint(url):
         return {
             "url": url,
             "status": "ERROR",
-            "error": str(e),
+            "error": str(e) or type(e).__name__,
             "timestamp": datetime.now().isoformat()
         }
 
-def monitor():
+async def monitor(session):
     print(f"\n📊 Monitoring at {datetime.now().isoformat()}")
     print("-" * 50)
     
-    for endpoint in ENDPOINTS:
-        result = check_endpoint(API_URL + endpoint)
+    # Probe every endpoint at once - a tick takes as long as the slowest one
+    results = await asyncio.gather(*(check_endpoint(session, API_URL + endpoint) for endpoint in ENDPOINTS))
+    
+    for endpoint, result in zip(ENDPOINTS, results):
         if result["status"] == 200:
             print(f"✅ {endpoint:30s} - {result['duration']}ms")
         else:
             print(f"❌ {endpoint:30s} - {result.get('error', result['status'])}")
 
+async def main():
+    # One session for the whole run keeps connections alive between ticks
+    async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+        while True:
+            await monitor(session)
+            await asyncio.sleep(60)  # Check every minute
+
 if __name__ == "__main__":
-    while True:
-        monitor()
-        time.sleep(60)  # Check every minute
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -7,11 +7,17 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.data.load_to_postgres import (
+    SALES_DATA_COLUMNS, add_segment_codes, copy_csv, drop_relation,
+    recreate_daily_sales, recreate_daily_customers, recreate_monthly_summary
+)
+
 # Database configuration - UPDATED WITH YOUR PASSWORD
 DB_CONFIG = {
     'host': 'localhost',
@@ -28,49 +34,61 @@ def get_engine():
 def reload_sales_data(engine):
     """Reload sales data from CSV"""
     print("\n📊 Reloading Sales Data...")
-    df = pd.read_csv('data/processed/online_retail_enhanced.csv')
     
-    # Ensure correct column names for database
-    df.to_sql('sales_data', engine, if_exists='replace', index=False, chunksize=10000)
-    print(f"✅ Loaded {len(df):,} rows")
-    return len(df)
+    # monthly_summary is built on sales_data and would block the drop
+    with engine.connect() as conn:
+        drop_relation(conn, 'monthly_summary')
+        conn.commit()
+    
+    # COPY streams the CSV from disk so the whole file is never held in memory
+    rows = copy_csv('data/processed/online_retail_enhanced.csv', 'sales_data', engine, SALES_DATA_COLUMNS)
+    print(f"✅ Loaded {rows:,} rows")
+    return rows
 
 def reload_rfm_data(engine):
     """Reload RFM data"""
     print("\n📊 Reloading RFM Data...")
     df = pd.read_csv('data/processed/rfm_segments.csv')
+    
+    # segment_summary is built on rfm_segments and would block the drop
+    with engine.connect() as conn:
+        drop_relation(conn, 'segment_summary')
+        conn.commit()
+    
     df.to_sql('rfm_segments', engine, if_exists='replace', index=False)
+    add_segment_codes(engine)
     print(f"✅ Loaded {len(df):,} rows")
     return len(df)
 
-def recreate_daily_sales(engine):
-    """Recreate daily sales from raw data"""
-    print("\n📊 Recreating Daily Sales...")
+def recreate_segment_summary(engine):
+    """Recreate segment summary as a materialized view over rfm_segments"""
+    print("\n📊 Recreating Segment Summary...")
     
     with engine.connect() as conn:
-        # Drop table if exists
-        conn.execute(text("DROP TABLE IF EXISTS daily_sales"))
+        drop_relation(conn, 'segment_summary')
         
-        # Create daily_sales table
         query = """
-        CREATE TABLE daily_sales AS
+        CREATE MATERIALIZED VIEW segment_summary AS
         SELECT 
-            DATE("InvoiceDate") as sale_date,
-            SUM("TotalRevenue") as daily_revenue,
-            COUNT(DISTINCT "InvoiceNo") as transaction_count,
-            AVG("TotalRevenue") as avg_order_value
-        FROM sales_data
-        GROUP BY DATE("InvoiceDate")
-        ORDER BY sale_date;
+            segment,
+            COUNT(*) as customer_count,
+            SUM(monetary) as total_revenue,
+            AVG(monetary) as avg_monetary,
+            COUNT(*) * 100.0 / SUM(COUNT(*)) OVER () as customer_percentage,
+            SUM(monetary) * 100.0 / SUM(SUM(monetary)) OVER () as revenue_percentage
+        FROM rfm_segments
+        GROUP BY segment;
         """
         
         conn.execute(text(query))
+        # Unique index lets the view be refreshed CONCURRENTLY without blocking reads
+        conn.execute(text("CREATE UNIQUE INDEX idx_segment_summary_segment ON segment_summary(segment)"))
         conn.commit()
         
         # Verify
-        result = conn.execute(text("SELECT COUNT(*) FROM daily_sales"))
+        result = conn.execute(text("SELECT COUNT(*) FROM segment_summary"))
         count = result.scalar()
-        print(f"✅ Created daily_sales with {count} rows")
+        print(f"✅ Created segment_summary with {count} rows")
         return count
 
 def recreate_country_summary(engine):
@@ -136,35 +154,64 @@ def recreate_product_summary(engine):
         print(f"✅ Created product_performance with {count} rows")
         return count
 
+def run_parallel(engine, steps):
+    """Run independent rebuild steps at once, each on its own pooled connection"""
+    with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+        return list(executor.map(lambda step: step(engine), steps))
+
+# Single source of truth for the indexes the API relies on
+INDEXES_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'indexes.sql')
+
+# Index builds run side by side, each with its own sort memory and parallel workers
+INDEX_WORKERS = 4
+INDEX_MAINTENANCE_WORK_MEM = '512MB'
+
+def create_index(engine, idx):
+    """Build one index on its own autocommit connection"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text(f"SET maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'"))
+            conn.execute(text("SET max_parallel_maintenance_workers = 4"))
+            conn.execute(text(idx))
+            print(f"✅ Created index: {idx[:50]}...")
+        except Exception as e:
+            print(f"⚠️ Index error: {e}")
+
+def read_index_statements():
+    """Read the CREATE INDEX statements from sql/indexes.sql"""
+    with open(INDEXES_SQL) as f:
+        sql = "".join(line for line in f if not line.lstrip().startswith("--"))
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
 def create_indexes(engine):
     """Create indexes for better performance"""
     print("\n📊 Creating Indexes...")
     
-    with engine.connect() as conn:
-        indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_sales_date ON sales_data(\"InvoiceDate\")",
-            "CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales_data(\"CustomerID\")",
-            "CREATE INDEX IF NOT EXISTS idx_sales_country ON sales_data(\"Country\")",
-            "CREATE INDEX IF NOT EXISTS idx_rfm_customer ON rfm_segments(customerid)",
-        ]
-        
-        for idx in indexes:
-            try:
-                conn.execute(text(idx))
-                conn.commit()
-                print(f"✅ Created index: {idx[:50]}...")
-            except Exception as e:
-                print(f"⚠️ Index error: {e}")
+    indexes = read_index_statements()
+    
+    with ThreadPoolExecutor(max_workers=INDEX_WORKERS) as executor:
+        list(executor.map(lambda idx: create_index(engine, idx), indexes))
     
     print("✅ Indexes created")
 
+def analyze_tables(engine):
+    """Refresh planner statistics and the visibility map after the bulk load"""
+    print("\n📊 Analyzing Tables...")
+    
+    # VACUUM cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ['sales_data', 'rfm_segments']:
+            conn.execute(text(f"VACUUM ANALYZE {table}"))
+    
+    print("✅ Tables analyzed")
+
 def verify_data(engine):
     """Verify all tables have data"""
     print("\n" + "="*60)
     print("🔍 VERIFYING DATA")
     print("="*60)
     
-    tables = ['sales_data', 'rfm_segments', 'daily_sales', 'country_summary', 'product_performance']
+    tables = ['sales_data', 'rfm_segments', 'segment_summary', 'daily_sales', 'daily_customers', 'monthly_summary', 'country_summary', 'product_performance']
     
     with engine.connect() as conn:
         for table in tables:
@@ -193,10 +240,18 @@ def main():
         # Reload all data
         reload_sales_data(engine)
         reload_rfm_data(engine)
-        recreate_daily_sales(engine)
-        recreate_country_summary(engine)
-        recreate_product_summary(engine)
+        
+        # Summaries only read the loaded tables, so they can be built side by side
+        run_parallel(engine, [
+            recreate_segment_summary,
+            recreate_daily_sales,
+            recreate_daily_customers,
+            recreate_monthly_summary,
+            recreate_country_summary,
+            recreate_product_summary,
+        ])
         create_indexes(engine)
+        analyze_tables(engine)
         
         # Verify
         verify_data(engine)
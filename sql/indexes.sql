@@ -0,0 +1,25 @@
+-- Indexes for API query patterns
+-- scripts/reload_data.py runs every statement in this file after a reload
+
+-- sales_data is loaded in date order, so a BRIN summary is enough for date ranges
+CREATE INDEX IF NOT EXISTS idx_sales_date_brin ON sales_data USING BRIN ("InvoiceDate") WITH (pages_per_range = 32);
+CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales_data("CustomerID");
+CREATE INDEX IF NOT EXISTS idx_sales_country_date ON sales_data("Country", "InvoiceDate");
+
+-- Distinct customers over a date range (/sales/summary)
+CREATE INDEX IF NOT EXISTS idx_daily_customers ON daily_customers(sale_date, customerid);
+
+-- Top products by revenue or quantity (/sales/products/top)
+CREATE INDEX IF NOT EXISTS idx_product_revenue ON product_performance(total_revenue DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_product_quantity ON product_performance(total_quantity DESC NULLS LAST);
+
+-- RFM lookups and segment listings
+CREATE INDEX IF NOT EXISTS idx_rfm_customer ON rfm_segments(customerid);
+CREATE INDEX IF NOT EXISTS idx_rfm_score ON rfm_segments(rfm_score DESC, monetary DESC);
+CREATE INDEX IF NOT EXISTS idx_rfm_segment_code ON rfm_segments(segment_code, monetary DESC);
+
+-- Forecast peak/low day lookups (ORDER BY predicted_revenue ... LIMIT 1)
+CREATE INDEX IF NOT EXISTS idx_sf_predicted_revenue ON sales_forecast(predicted_revenue DESC);
+
+-- Daily forecast listing (ORDER BY forecast_date)
+CREATE INDEX IF NOT EXISTS idx_sf_date ON sales_forecast(forecast_date);
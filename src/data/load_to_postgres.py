@@ -1,7 +1,15 @@
 import pandas as pd
 from sqlalchemy import create_engine, text
+import os
+import sys
+import csv
 from datetime import datetime
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.segments import SEGMENT_OTHER, SEGMENT_PATTERNS
+
 # Database Configuration
 DB_CONFIG = {
     'host': 'localhost',
@@ -15,13 +23,194 @@ def get_engine():
     connection_string = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
     return create_engine(connection_string)
 
+def drop_relation(conn, name):
+    """Drop a table or materialized view, whichever currently exists"""
+    kind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'm')"),
+        {"name": name}
+    ).scalar()
+    if kind == 'm':
+        conn.execute(text(f"DROP MATERIALIZED VIEW {name}"))
+    elif kind == 'r':
+        conn.execute(text(f"DROP TABLE {name}"))
+
+# Column types for online_retail_enhanced.csv - columns not listed here load as TEXT
+SALES_DATA_COLUMNS = {
+    'InvoiceNo': 'TEXT',
+    'StockCode': 'TEXT',
+    'Description': 'TEXT',
+    'Quantity': 'BIGINT',
+    'InvoiceDate': 'TIMESTAMP',
+    'UnitPrice': 'DOUBLE PRECISION',
+    'CustomerID': 'DOUBLE PRECISION',
+    'Country': 'TEXT',
+    'TotalRevenue': 'DOUBLE PRECISION',
+    'Year': 'BIGINT',
+    'Month': 'BIGINT',
+    'Day': 'BIGINT',
+    'Hour': 'BIGINT',
+    'DayOfWeek': 'BIGINT',
+    'Quarter': 'BIGINT',
+    'YearMonth': 'TEXT',
+    'PriceRange': 'TEXT',
+    'Month_Name': 'TEXT',
+    'Year_Num': 'BIGINT',
+}
+
+def copy_csv(path, table, engine, column_types):
+    """Replace a table with a CSV's rows, creating it from explicit column types"""
+    with open(path, newline='') as f:
+        header = next(csv.reader(f))
+        f.seek(0)
+        
+        columns = ", ".join(f'"{column}"' for column in header)
+        column_defs = ", ".join(f'"{column}" {column_types.get(column, "TEXT")}' for column in header)
+        
+        # CREATE and COPY share one transaction, so a failed load keeps the old table
+        raw = engine.raw_connection()
+        try:
+            with raw.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+                cur.execute(f"CREATE TABLE {table} ({column_defs})")
+                cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, HEADER true)", f)
+                rows = cur.rowcount
+            raw.commit()
+        finally:
+            raw.close()
+    return rows
+
+def add_segment_codes(engine):
+    """Add a compact segment_code column so the API can filter with an index"""
+    cases = " ".join(f"WHEN segment LIKE :pattern_{code} THEN {code}" for code, _ in SEGMENT_PATTERNS)
+    params = {f"pattern_{code}": pattern for code, pattern in SEGMENT_PATTERNS}
+    
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE rfm_segments ADD COLUMN IF NOT EXISTS segment_code SMALLINT"))
+        conn.execute(text(f"UPDATE rfm_segments SET segment_code = CASE {cases} ELSE {SEGMENT_OTHER} END"), params)
+        conn.commit()
+
+def recreate_daily_sales(engine):
+    """Recreate daily sales from raw data"""
+    print("\n📊 Recreating Daily Sales...")
+    
+    with engine.connect() as conn:
+        # Drop table if exists
+        conn.execute(text("DROP TABLE IF EXISTS daily_sales"))
+        
+        # Create daily_sales table
+        query = """
+        CREATE TABLE daily_sales AS
+        SELECT 
+            DATE("InvoiceDate") as sale_date,
+            SUM("TotalRevenue") as daily_revenue,
+            COUNT(DISTINCT "InvoiceNo") as transaction_count,
+            AVG("TotalRevenue") as avg_order_value,
+            COUNT(*) as line_count
+        FROM sales_data
+        GROUP BY DATE("InvoiceDate")
+        ORDER BY sale_date;
+        """
+        
+        conn.execute(text(query))
+        conn.commit()
+        
+        # Verify
+        result = conn.execute(text("SELECT COUNT(*) FROM daily_sales"))
+        count = result.scalar()
+        print(f"✅ Created daily_sales with {count} rows")
+        return count
+
+def recreate_daily_customers(engine):
+    """Recreate the distinct customers seen on each day"""
+    print("\n📊 Recreating Daily Customers...")
+    
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS daily_customers"))
+        
+        # One row per customer per day - distinct customers over any date range come from here
+        query = """
+        CREATE TABLE daily_customers AS
+        SELECT 
+            DATE("InvoiceDate") as sale_date,
+            "CustomerID" as customerid
+        FROM sales_data
+        WHERE "CustomerID" IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1;
+        """
+        
+        conn.execute(text(query))
+        conn.commit()
+        
+        # Verify
+        result = conn.execute(text("SELECT COUNT(*) FROM daily_customers"))
+        count = result.scalar()
+        print(f"✅ Created daily_customers with {count} rows")
+        return count
+
+def recreate_monthly_summary(engine):
+    """Recreate monthly summary as a materialized view over sales_data"""
+    print("\n📊 Recreating Monthly Summary...")
+    
+    with engine.connect() as conn:
+        drop_relation(conn, 'monthly_summary')
+        
+        # Distinct orders and customers per month come from GROUP BY subqueries
+        query = """
+        CREATE MATERIALIZED VIEW monthly_summary AS
+        SELECT 
+            o.month,
+            CAST(LEFT(o.month, 4) AS integer) as year,
+            o.revenue,
+            c.customers,
+            o.orders
+        FROM (
+            SELECT month, SUM(revenue) as revenue, COUNT("InvoiceNo") as orders
+            FROM (
+                SELECT TO_CHAR("InvoiceDate", 'YYYY-MM') as month, "InvoiceNo", SUM("TotalRevenue") as revenue
+                FROM sales_data
+                GROUP BY 1, 2
+            ) invoices
+            GROUP BY month
+        ) o
+        JOIN (
+            SELECT month, COUNT("CustomerID") as customers
+            FROM (
+                SELECT TO_CHAR("InvoiceDate", 'YYYY-MM') as month, "CustomerID"
+                FROM sales_data
+                GROUP BY 1, 2
+            ) buyers
+            GROUP BY month
+        ) c USING (month);
+        """
+        
+        conn.execute(text(query))
+        # Unique index lets the view be refreshed CONCURRENTLY without blocking reads
+        conn.execute(text("CREATE UNIQUE INDEX idx_monthly_summary_month ON monthly_summary(month)"))
+        conn.commit()
+        
+        # Verify
+        result = conn.execute(text("SELECT COUNT(*) FROM monthly_summary"))
+        count = result.scalar()
+        print(f"✅ Created monthly_summary with {count} rows")
+        return count
+
 def load_sales_data(engine):
     print("\n📊 Loading Sales Data...")
     try:
-        df = pd.read_csv('data/processed/online_retail_enhanced.csv')
-        df.to_sql('sales_data', engine, if_exists='replace', index=False, chunksize=10000)
-        print(f"✅ Loaded {len(df):,} rows")
-        return len(df)
+        # monthly_summary is built on sales_data and would block the drop
+        with engine.connect() as conn:
+            drop_relation(conn, 'monthly_summary')
+            conn.commit()
+        
+        rows = copy_csv('data/processed/online_retail_enhanced.csv', 'sales_data', engine, SALES_DATA_COLUMNS)
+        print(f"✅ Loaded {rows:,} rows")
+        
+        # The API reads these roll-ups instead of sales_data, so rebuild them with it
+        recreate_daily_sales(engine)
+        recreate_daily_customers(engine)
+        recreate_monthly_summary(engine)
+        return rows
     except Exception as e:
         print(f"❌ Error loading sales data: {e}")
         return 0
@@ -30,7 +219,14 @@ def load_rfm_data(engine):
     print("\n📊 Loading RFM Segments...")
     try:
         df = pd.read_csv('data/processed/rfm_segments.csv')
+        
+        # segment_summary may be a materialized view on rfm_segments and would block the drop
+        with engine.connect() as conn:
+            drop_relation(conn, 'segment_summary')
+            conn.commit()
+        
         df.to_sql('rfm_segments', engine, if_exists='replace', index=False)
+        add_segment_codes(engine)
         print(f"✅ Loaded {len(df):,} rows")
         return len(df)
     except Exception as e:
@@ -41,6 +237,12 @@ def load_segment_summary(engine):
     print("\n📊 Loading Segment Summary...")
     try:
         df = pd.read_csv('data/processed/segment_summary.csv')
+        
+        # reload_data.py builds segment_summary as a materialized view, which to_sql cannot replace
+        with engine.connect() as conn:
+            drop_relation(conn, 'segment_summary')
+            conn.commit()
+        
         df.to_sql('segment_summary', engine, if_exists='replace', index=False)
         print(f"✅ Loaded {len(df)} rows")
         return len(df)